@@ -1,22 +1,100 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import DDL, event, inspect
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import (Session, lazyload, load_only, object_session,
+                            raiseload, selectinload)
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.pool import NullPool
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 db = SQLAlchemy()
 
-Base = declarative_base()
+def init_app(app):
+    """
+    Binds db to the given Flask application. Unless the application sets
+    SQLALCHEMY_ENGINE_OPTIONS itself, the connection pool is sized from the
+    DB_POOL_SIZE and DB_MAX_OVERFLOW environment variables, and connections are
+    checked before they are used and recycled every 30 minutes.
+    """
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+    # Flask-SQLAlchemy falls back to an in-memory SQLite database when no URI
+    # is configured.
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or 'sqlite:///:memory:'
+    if make_url(uri).get_backend_name() == 'sqlite':
+        # Connections to a SQLite file are closed as soon as the session is
+        # done with them. Flask-SQLAlchemy already does this for plain sqlite://
+        # URIs, but not for ones that name a driver (e.g. sqlite+pysqlite://).
+        # In-memory databases keep their default pool, since closing their
+        # connection drops the data.
+        if not _is_sqlite_memory(uri):
+            options['poolclass'] = NullPool
+    else:
+        options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 20))
+        options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', 30))
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', options)
+    db.init_app(app)
+
+def _is_sqlite_memory(uri):
+    """
+    Checks whether the given SQLite URI refers to an in-memory database.
+    """
+    return make_url(uri).database in (None, '', ':memory:')
+
+raise_on_lazy_load = False
+"""
+Whether the queries built by bulk_query() raise when a relationship that was
+not eagerly loaded is accessed, instead of lazily loading it. Test suites should
+switch it on, so that accidental N+1 queries fail instead of going unnoticed.
+"""
+
+def bulk_query(model, *eager, only=False):
+    """
+    Builds a query for many rows of the given model, which loads each of the
+    given relationships with one extra query (but not the relationships of the
+    related rows). Any other relationship follows its default loading, or is
+    loaded lazily if only is set. If raise_on_lazy_load is set, any relationship
+    that is not given raises instead.
+    """
+    options = []
+    for r in eager:
+        if raise_on_lazy_load:
+            options.append(selectinload(r).raiseload('*'))
+        else:
+            options.append(selectinload(r).lazyload('*'))
+    if raise_on_lazy_load:
+        options.append(raiseload('*'))
+    elif only:
+        options.append(lazyload('*'))
+    return db.select(model).options(*options)
 
 coauthors = db.Table('coauthor',
                      db.Column('author_id', db.Integer,
                                db.ForeignKey('author.id')),
                      db.Column('coauthor_id', db.Integer,
-                               db.ForeignKey('author.id'))
+                               db.ForeignKey('author.id')),
+                     db.Index('ix_coauthor_author', 'author_id'),
+                     db.Index('ix_coauthor_coauthor', 'coauthor_id')
 )
 
 author_publications = db.Table('author_publication',
                                db.Column('author_id', db.Integer,
                                          db.ForeignKey('author.id')),
                                db.Column('publication_id', db.Integer,
-                                         db.ForeignKey('publication.id'))
+                                         db.ForeignKey('publication.id')),
+                               db.Index('ix_ap_author', 'author_id'),
+                               db.Index('ix_ap_pub', 'publication_id')
 )
 
 class Author(db.Model):
@@ -29,12 +107,20 @@ class Author(db.Model):
     The name of the table where authors are stored.
     """
 
+    __table_args__ = (
+        db.Index('ix_author_org', 'organization_id'),
+    )
+    """
+    The indexes of the table. Authors are looked up by organization when
+    counting the authors of an organization subtree.
+    """
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     """
     The ID of the author.
     """
 
-    name = db.Column(db.String(256), nullable=False)
+    name = db.Column(db.String(256), nullable=False, index=True)
     """
     The name of the author.
     """
@@ -50,8 +136,9 @@ class Author(db.Model):
     The ID of the organization where the author belongs.
     """
 
-    organization = db.relation('Organization', foreign_keys=[organization_id],
-                               backref="authors")
+    organization = db.relationship('Organization',
+                                   foreign_keys=[organization_id],
+                                   back_populates="authors", lazy="selectin")
     """
     The organization where the author belongs.
     """
@@ -98,12 +185,12 @@ class Author(db.Model):
     The total citations for the author.
     """
 
-    h_index = db.Column(db.Numeric(precision=10, scale=2), nullable=True)
+    h_index = db.Column(db.SmallInteger, nullable=True)
     """
     The value of the h-index metric for the author.
     """
 
-    i10_index = db.Column(db.Numeric(precision=10, scale=2), nullable=True)
+    i10_index = db.Column(db.SmallInteger, nullable=True)
     """
     The value of the i10-index metric for the author.
     """
@@ -116,25 +203,52 @@ class Author(db.Model):
 
     coauthors = db.relationship("Author", secondary=coauthors,
                                 primaryjoin=id == coauthors.c.author_id,
-                                secondaryjoin=id == coauthors.c.coauthor_id)
+                                secondaryjoin=id == coauthors.c.coauthor_id,
+                                lazy="select")
     """
-    The co-authors of the author.
+    The co-authors of the author. They are loaded lazily, since every co-author
+    would in turn load its own eager relationships; lists of authors that show
+    co-authors should ask for them, e.g. bulk_query(Author, Author.coauthors).
     """
 
     publications = db.relationship("Publication",
                                    secondary=author_publications,
-                                   backref="authors")
+                                   back_populates="authors", lazy="selectin")
     """
     The publications of the author.
     """
 
     citations_per_year = db.relationship("AuthorCitationsPerYear",
                                          cascade="all, delete-orphan",
-                                         order_by="AuthorCitationsPerYear.year")
+                                         order_by="AuthorCitationsPerYear.year",
+                                         back_populates="author",
+                                         lazy="selectin")
     """
     The citations per year for the author.
     """
 
+    @classmethod
+    def list_query(cls):
+        """
+        Builds a query for lists of authors, which only loads the columns that
+        such lists show and the ID and name of the organization of each author.
+        """
+        return bulk_query(cls, only=True).options(
+            load_only(cls.id, cls.name, cls.total_citations,
+                      cls.organization_id),
+            selectinload(cls.organization).load_only(Organization.id,
+                                                     Organization.name))
+
+    def coauthor_ids(self):
+        """
+        Gets the ID's of the co-authors of the author. Only the coauthor table
+        is read, so no author rows are fetched.
+        """
+        query = db.select(coauthors.c.coauthor_id).where(
+            coauthors.c.author_id == self.id)
+        session = object_session(self) or db.session
+        return session.execute(query).scalars().all()
+
     def organization_tree(self):
         """
         Gets the names of the organization, where the author belongs, and all
@@ -143,9 +257,13 @@ class Author(db.Model):
         """
         if not self.organization:
           return ''
-        organizations = [self.organization]
-        organizations.extend(self.organization.ancestors())
-        return ' :: '.join([a.name for a in reversed(organizations)])
+        if not self.organization._hierarchy_changed():
+            if self.organization.materialized_path is not None:
+                return self.organization.materialized_path
+        ancestor_tree = self.organization.ancestor_tree()
+        if ancestor_tree is None:
+          return self.organization.name
+        return ancestor_tree + ' :: ' + self.organization.name
 
     def organization_ids(self):
         """
@@ -158,6 +276,20 @@ class Author(db.Model):
         organizations.extend(self.organization.ancestors())
         return [a.id for a in reversed(organizations)]
 
+def _has_pg_trgm(ddl, target, bind, **kw):
+    """
+    Checks whether the pg_trgm extension is installed in the database.
+    """
+    query = db.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    return bind.execute(query).first() is not None
+
+# On PostgreSQL with pg_trgm installed, a trigram index on the names of the
+# authors lets substring searches (e.g. ILIKE '%name%') use an index as well.
+event.listen(Author.__table__, 'after_create',
+             DDL("CREATE INDEX ix_author_name_trgm ON author "
+                 "USING gin (name gin_trgm_ops)")
+             .execute_if(dialect='postgresql', callable_=_has_pg_trgm))
+
 class AuthorCitationsPerYear(db.Model):
     """
     A class that represents the citations for authors per year.
@@ -168,15 +300,25 @@ class AuthorCitationsPerYear(db.Model):
     The name of the table where citations per year are stored.
     """
 
+    __table_args__ = (
+        db.Index('ix_acpy_author_year_cit', 'author_id', 'year', 'citations'),
+    )
+    """
+    The indexes of the table. The index covers the citations, so scans over the
+    citations per year never have to visit the table itself.
+    """
+
     author_id = db.Column(db.Integer, db.ForeignKey('author.id'),
                           primary_key=True)
     """
     The ID of the author.
     """
 
-    author = db.relation('Author')
+    author = db.relationship('Author', back_populates="citations_per_year",
+                             lazy="raise")
     """
-    The author.
+    The author. Loading it raises, since citations are always reached through
+    their author.
     """
 
     year = db.Column(db.Integer, primary_key=True)
@@ -200,6 +342,16 @@ class Organization(db.Model):
     The name of the table where organizations are stored.
     """
 
+    __table_args__ = (
+        db.Index('ix_org_parent', 'parent_id'),
+        db.Index('ix_org_materialized_path', 'materialized_path',
+                 mysql_length=255),
+    )
+    """
+    The indexes of the table. Children are looked up by parent when walking
+    down the family tree, and organizations are looked up by their path.
+    """
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     """
     The ID of the organization.
@@ -216,7 +368,8 @@ class Organization(db.Model):
     The ID of the parent organization.
     """
 
-    parent = db.relation('Organization', remote_side=[id], backref="children")
+    parent = db.relationship('Organization', remote_side=[id],
+                             backref="children", lazy="select")
     """
     The parent organization.
     """
@@ -242,21 +395,93 @@ class Organization(db.Model):
     The URL where the children of the organization can be retrieved from.
     """
 
+    materialized_path = db.Column(db.Text, nullable=True)
+    """
+    The names of the organization and all its ancestors (starting from the root
+    of the family tree) separated with ' :: '. It is kept up to date whenever
+    organizations are written, and is empty for organizations stored before it
+    was introduced (see rebuild_materialized_paths()).
+    """
+
+    authors = db.relationship('Author', back_populates="organization")
+    """
+    The authors that belong to the organization.
+    """
+
+    @classmethod
+    def rebuild_materialized_paths(cls, session):
+        """
+        Recomputes the materialized paths of all the organizations.
+        """
+        rows = session.execute(db.select(cls.id, cls.name, cls.parent_id)).all()
+        paths = _descendant_paths(rows, None, None)
+        if paths:
+            session.execute(cls.__table__.update()
+                            .where(cls.id == db.bindparam('org_id'))
+                            .values(materialized_path=db.bindparam('path')),
+                            [{'org_id': i, 'path': p} for i, p in paths.items()])
+        session.expire_all()
+
     def children_ids(self):
         """
         Gets the ID's of the children of the organization.
         """
         return [c.id for c in self.children]
 
+    @classmethod
+    def ancestors_of(cls, session, org_id):
+        """
+        Gets the organization with the given ID followed by all its ancestors
+        (ending at the root of the family tree). The whole chain is fetched
+        with a single recursive query instead of one query per level.
+        """
+        query = db.text("""
+            WITH RECURSIVE anc(id, parent_id, depth) AS (
+                SELECT id, parent_id, 0
+                FROM organization
+                WHERE id = :id
+                UNION ALL
+                SELECT o.id, o.parent_id, anc.depth + 1
+                FROM organization o JOIN anc ON o.id = anc.parent_id
+            )
+            SELECT organization.*
+            FROM organization JOIN anc ON organization.id = anc.id
+            ORDER BY anc.depth
+        """)
+        return session.query(cls).from_statement(query).params(id=org_id).all()
+
     def ancestors(self):
         """
         Gets the ancestors of the organization (starting from its parent and
         ending at the root of the family tree).
         """
-        if self.parent is None:
-          return []
-        l = [self.parent]
-        l.extend(self.parent.ancestors())
+        # Walk up as long as the parents are already in memory.
+        l = []
+        node = self
+        parent = _loaded_parent(node)
+        while parent is not _NOT_LOADED:
+            if parent is None:
+                return l
+            l.append(parent)
+            node = parent
+            parent = _loaded_parent(node)
+        # Fetch the rest of the chain with the recursive query, and link it up,
+        # so that the next walk finds it in memory.
+        identity = inspect(node).identity
+        if identity is None and node.parent_id is None:
+            return l
+        session = object_session(self) or db.session
+        if identity is not None:
+            chain = Organization.ancestors_of(session, identity[0])
+        else:
+            # The organization has not been flushed yet, so it is not visible
+            # to the recursive query.
+            chain = [node]
+            chain.extend(Organization.ancestors_of(session, node.parent_id))
+        for child, parent in zip(chain, chain[1:] + [None]):
+            if 'parent' not in child.__dict__:
+                set_committed_value(child, 'parent', parent)
+        l.extend(chain[1:])
         return l
 
     def ancestor_ids(self):
@@ -266,43 +491,164 @@ class Organization(db.Model):
         """
         return [a.id for a in self.ancestors()]
 
+    def _renamed_or_moved(self):
+        """
+        Checks whether the organization is new, or has been renamed or moved
+        since it was last flushed.
+        """
+        if self.id is None:
+            return True
+        attrs = inspect(self).attrs
+        return (attrs.name.history.has_changes()
+                or attrs.parent_id.history.has_changes()
+                or attrs.parent.history.has_changes())
+
+    def _hierarchy_changed(self):
+        """
+        Checks whether the organization, or any other organization in its
+        session, is new or has been renamed or moved since it was last flushed,
+        in which case the stored path and the cached names may be out of date.
+        """
+        if self._renamed_or_moved():
+            return True
+        session = object_session(self)
+        if session is None:
+            return False
+        return any(isinstance(o, Organization) and o._renamed_or_moved()
+                   for o in session.dirty)
+
     def ancestor_tree(self):
         """
         Gets the names of the ancestors of the organization (starting from the
         root of the family tree) separated with ' :: '.
         """
+        # The stored path and the cached names are only used while no
+        # organization in the session has unflushed renames or moves.
+        if not self._hierarchy_changed():
+            if self.materialized_path is not None:
+                if self.parent_id is None:
+                  return None
+                return self.materialized_path[:-len(' :: ' + self.name)]
+            names = _ancestor_names(object_session(self) or db.session(),
+                                    self.id)[:-1]
+            if not names:
+              return None
+            return ' :: '.join(names)
         ancestors = self.ancestors()
         if not ancestors:
           return None
         return ' :: '.join([a.name for a in reversed(ancestors)])
 
+    @classmethod
+    def subtree(cls, session, root_id):
+        """
+        Gets the organization with the given ID and all its descendants, using
+        a single recursive query.
+        """
+        query = db.text("""
+            WITH RECURSIVE sub(id) AS (
+                SELECT id
+                FROM organization
+                WHERE id = :root
+                UNION ALL
+                SELECT o.id
+                FROM organization o JOIN sub ON o.parent_id = sub.id
+            )
+            SELECT organization.*
+            FROM organization JOIN sub ON organization.id = sub.id
+        """)
+        return session.query(cls).from_statement(query).params(root=root_id).all()
+
+    @classmethod
+    def author_counts(cls, session, org_ids):
+        """
+        Gets the number of the authors that belong to each of the organizations
+        with the given ID's, as a dictionary keyed by organization ID.
+        Organizations without authors are omitted.
+        """
+        if not org_ids:
+            return {}
+        return dict(session.query(Author.organization_id,
+                                  db.func.count(Author.id))
+                    .filter(Author.organization_id.in_(org_ids))
+                    .group_by(Author.organization_id)
+                    .all())
+
     def descendants(self):
         """
         Gets the descendants of the organization (starting from its children and
         ending at the leaves of the family tree).
         """
-        if not self.children:
-            return []
+        if self.id is None:
+            # The organization has not been flushed yet, so it is not visible
+            # to the recursive query.
+            children_of = lambda o: o.children
+        else:
+            children = {}
+            session = object_session(self) or db.session
+            for o in Organization.subtree(session, self.id):
+                children.setdefault(o.parent_id, []).append(o)
+            children_of = lambda o: children.get(o.id, [])
         l = []
-        for c in self.children:
+        stack = list(reversed(children_of(self)))
+        while stack:
+            c = stack.pop()
             l.append(c)
-            l.extend(c.descendants())
+            stack.extend(reversed(children_of(c)))
         return l
 
     def descendant_tree(self):
         """
         Gets the descendants of the organization as a tree (starting from the
-        children).
-        """
-        descendants = []
-        for c in self.children:
-            descendants.append({
-                'id': c.id,
-                'name': c.name,
-                'children': c.descendant_tree(),
-                'number_of_authors': c.number_of_authors()
-            })
-        return descendants
+        children). The subtree and the number of authors of each node are
+        fetched with two queries, regardless of the size of the tree.
+        """
+        if self.id is None:
+            # The organization has not been flushed yet, so it is not visible
+            # to the recursive query.
+            tree = []
+            stack = [(self, tree)]
+            while stack:
+                parent, siblings = stack.pop()
+                for c in parent.children:
+                    node = {
+                        'id': c.id,
+                        'name': c.name,
+                        'children': [],
+                        'number_of_authors': c.number_of_authors()
+                    }
+                    siblings.append(node)
+                    stack.append((c, node['children']))
+            return tree
+        session = object_session(self) or db.session
+        organizations = Organization.subtree(session, self.id)
+        counts = Organization.author_counts(session,
+                                            [o.id for o in organizations])
+        nodes = {}
+        for o in organizations:
+            nodes[o.id] = {
+                'id': o.id,
+                'name': o.name,
+                'children': [],
+                'number_of_authors': counts.get(o.id, 0)
+            }
+        for o in organizations:
+            if o.id != self.id and o.parent_id in nodes:
+                nodes[o.parent_id]['children'].append(nodes[o.id])
+        if self.id not in nodes:
+            return []
+        return nodes[self.id]['children']
+
+    def descendant_tree_json(self):
+        """
+        Gets the descendants of the organization as a tree (see
+        descendant_tree()) serialized as JSON bytes. orjson is used for the
+        serialization when it is installed.
+        """
+        tree = self.descendant_tree()
+        if orjson is not None:
+            return orjson.dumps(tree)
+        return json.dumps(tree, separators=(',', ':')).encode('utf-8')
 
     def descendant_ids(self):
         """
@@ -315,7 +661,201 @@ class Organization(db.Model):
         """
         Gets the number of the authors that belong to the organization.
         """
-        return len(self.authors);
+        if self.id is None:
+            return len(self.authors)
+        return self.num_authors
+
+_NOT_LOADED = object()
+"""
+Returned by _loaded_parent() when the parent is not in memory.
+"""
+
+def _loaded_parent(org):
+    """
+    Gets the parent of the given organization (None for a root) if it can be
+    found without a query, or _NOT_LOADED otherwise.
+    """
+    if 'parent' in org.__dict__:
+        return org.__dict__['parent']
+    if 'parent_id' not in org.__dict__:
+        return _NOT_LOADED
+    if org.parent_id is None:
+        return None
+    session = object_session(org)
+    if session is None:
+        return _NOT_LOADED
+    key = inspect(Organization).identity_key_from_primary_key((org.parent_id,))
+    parent = session.identity_map.get(key)
+    return _NOT_LOADED if parent is None else parent
+
+Organization.num_authors = db.column_property(
+    db.select(db.func.count(Author.id))
+    .where(Author.organization_id == Organization.id)
+    .correlate_except(Author)
+    .scalar_subquery(),
+    deferred=True)
+"""
+The number of the authors that belong to the organization, counted by the
+database. It is deferred, so it is only queried when accessed.
+"""
+
+_ancestor_names_cache = OrderedDict()
+"""
+The names cached by _ancestor_names(), keyed by the URL of the database and the
+ID of the organization, starting from the least recently used.
+"""
+
+_ancestor_names_lock = threading.Lock()
+"""
+Guards _ancestor_names_cache and _ancestor_names_generation, which are shared
+by all the threads of the process.
+"""
+
+_ancestor_names_generation = 0
+"""
+Counts the times the cache has been cleared, so that names read before a clear
+are not cached after it.
+"""
+
+def _ancestor_names(session, org_id):
+    """
+    Gets the names of the organization with the given ID and all its ancestors
+    (starting from the root of the family tree), reading them through the given
+    session. The names are cached until an organization is written by this
+    process.
+    """
+    key = (session.get_bind(inspect(Organization)).url, org_id)
+    with _ancestor_names_lock:
+        names = _ancestor_names_cache.get(key)
+        if names is not None:
+            _ancestor_names_cache.move_to_end(key)
+            return names
+        generation = _ancestor_names_generation
+    organizations = Organization.ancestors_of(session, org_id)
+    names = tuple(o.name for o in reversed(organizations))
+    # Once the session has written organizations, what it reads may still be
+    # rolled back, so nothing is cached until its transaction ends.
+    if names and not session.info.get('organizations_written'):
+        with _ancestor_names_lock:
+            if generation == _ancestor_names_generation:
+                _ancestor_names_cache[key] = names
+                if len(_ancestor_names_cache) > 4096:
+                    _ancestor_names_cache.popitem(last=False)
+    return names
+
+def _clear_ancestor_names_cache():
+    """
+    Drops all the cached ancestor names.
+    """
+    global _ancestor_names_generation
+    with _ancestor_names_lock:
+        _ancestor_names_cache.clear()
+        _ancestor_names_generation += 1
+
+@event.listens_for(Organization, 'after_insert')
+@event.listens_for(Organization, 'after_update')
+@event.listens_for(Organization, 'after_delete')
+def _clear_ancestor_names(mapper, connection, target):
+    """
+    Drops the cached ancestor names whenever an organization is written, and
+    marks the session, so that no names are cached until its transaction ends.
+    """
+    _clear_ancestor_names_cache()
+    session = object_session(target)
+    if session is not None:
+        session.info['organizations_written'] = True
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _end_organization_writes(session):
+    """
+    Drops the cached ancestor names once a transaction that wrote organizations
+    is over, since other sessions may have cached names it has replaced.
+    """
+    if session.info.pop('organizations_written', False):
+        _clear_ancestor_names_cache()
+
+def _descendant_paths(rows, root_id, root_path):
+    """
+    Computes the materialized paths of the organizations below the one with the
+    given ID and path, from rows of (id, name, parent_id). A root_id of None
+    computes the paths of whole family trees.
+    """
+    children = {}
+    for r in rows:
+        children.setdefault(r.parent_id, []).append(r)
+    paths = {}
+    stack = [(root_id, root_path)]
+    while stack:
+        parent_id, parent_path = stack.pop()
+        for r in children.get(parent_id, []):
+            if parent_path is None:
+                path = r.name
+            else:
+                path = parent_path + ' :: ' + r.name
+            paths[r.id] = path
+            stack.append((r.id, path))
+    return paths
+
+@event.listens_for(Organization, 'before_insert')
+@event.listens_for(Organization, 'before_update')
+def _set_materialized_path(mapper, connection, target):
+    """
+    Sets the materialized path of an organization that is new, renamed or
+    moved, from the stored path of its parent.
+    """
+    state = inspect(target)
+    if (target.materialized_path is not None
+            and not state.attrs.name.history.has_changes()
+            and not state.attrs.parent_id.history.has_changes()):
+        return
+    if target.parent_id is None:
+        target.materialized_path = target.name
+        return
+    parent_path = connection.execute(
+        db.select(Organization.materialized_path)
+        .where(Organization.id == target.parent_id)).scalar()
+    if parent_path is None:
+        # The ancestors have no paths yet, so leave it to
+        # rebuild_materialized_paths().
+        target.materialized_path = None
+    else:
+        target.materialized_path = parent_path + ' :: ' + target.name
+
+@event.listens_for(Organization, 'after_update')
+def _update_descendant_paths(mapper, connection, target):
+    """
+    Rewrites the materialized paths of the descendants of an organization whose
+    path has changed, with one query for the subtree and one UPDATE.
+    """
+    if (target.materialized_path is None
+            or not inspect(target).attrs.materialized_path.history.has_changes()):
+        return
+    rows = connection.execute(db.text("""
+        WITH RECURSIVE sub(id) AS (
+            SELECT id
+            FROM organization
+            WHERE parent_id = :root
+            UNION ALL
+            SELECT o.id
+            FROM organization o JOIN sub ON o.parent_id = sub.id
+        )
+        SELECT organization.id, organization.name, organization.parent_id
+        FROM organization JOIN sub ON organization.id = sub.id
+    """), {'root': target.id}).all()
+    paths = _descendant_paths(rows, target.id, target.materialized_path)
+    if not paths:
+        return
+    connection.execute(Organization.__table__.update()
+                       .where(Organization.id == db.bindparam('org_id'))
+                       .values(materialized_path=db.bindparam('path')),
+                       [{'org_id': i, 'path': p} for i, p in paths.items()])
+    # Keep the descendants that are already loaded in line with the database.
+    session = object_session(target)
+    for i, p in paths.items():
+        o = session.identity_map.get(mapper.identity_key_from_primary_key((i,)))
+        if o is not None:
+            set_committed_value(o, 'materialized_path', p)
 
 class Publication(db.Model):
     """
@@ -327,6 +867,14 @@ class Publication(db.Model):
     The name of the table where publications are stored.
     """
 
+    __table_args__ = (
+        db.Index('ix_publication_title', 'title', mysql_length=255),
+    )
+    """
+    The indexes of the table. Publications are looked up by title, and on
+    MySQL only a prefix of the title is indexed.
+    """
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     """
     The ID of the publication.
@@ -342,9 +890,12 @@ class Publication(db.Model):
     The title of the publication.
     """
 
-    author_names = db.Column('authors', db.String(512), nullable=True)
+    author_names = db.deferred(db.Column('authors', db.String(512),
+                                         nullable=True))
     """
-    The names of the authors of the publication separated with commas.
+    The names of the authors of the publication separated with commas, as
+    retrieved from Google Scholar. It is only meant for display, so it is not
+    loaded until accessed; queries by author should go through authors.
     """
 
     scholar_id = db.Column(db.String(64), nullable=True, unique=True)
@@ -369,11 +920,18 @@ class Publication(db.Model):
     """
 
     citations_per_year = db.relationship("PublicationCitationsPerYear",
-                                         cascade="all, delete-orphan")
+                                         cascade="all, delete-orphan",
+                                         back_populates="publication")
     """
     The citations per year for the publication.
     """
 
+    authors = db.relationship("Author", secondary=author_publications,
+                              back_populates="publications")
+    """
+    The authors of the publication, among those stored in the database.
+    """
+
     # These fields were added as a new feature request
     venue = db.Column(db.String(256), nullable=True)
     """
@@ -411,15 +969,26 @@ class PublicationCitationsPerYear(db.Model):
     The name of the table where citations per year are stored.
     """
 
+    __table_args__ = (
+        db.Index('ix_pcpy_pub_year_cit', 'publication_id', 'year', 'citations'),
+    )
+    """
+    The indexes of the table. The index covers the citations, so scans over the
+    citations per year never have to visit the table itself.
+    """
+
     publication_id = db.Column(db.Integer, db.ForeignKey('publication.id'),
                                primary_key=True)
     """
     The ID of the publication.
     """
 
-    publication = db.relation('Publication')
+    publication = db.relationship('Publication',
+                                  back_populates="citations_per_year",
+                                  lazy="raise")
     """
-    The publication.
+    The publication. Loading it raises, since citations are always reached
+    through their publication.
     """
 
     year = db.Column(db.Integer, primary_key=True)
@@ -452,12 +1021,12 @@ class Benchmark(db.Model):
     The name of the benchmark.
     """
 
-    the_query = db.Column('query', db.Text, nullable=False)
+    the_query = db.deferred(db.Column('query', db.Text, nullable=False))
     """
     The query that is associated with the benchmark.
     """
 
-    description = db.Column(db.Text, nullable=True)
+    description = db.deferred(db.Column(db.Text, nullable=True))
     """
     The description of the benchmark in plain English
     """
@@ -487,12 +1056,12 @@ class Suggestions(db.Model):
     The ID of the benchmark. This will never be empty
     """
 
-    scholar_website = db.Column(db.Text)
+    scholar_website = db.deferred(db.Column(db.Text))
     """
     URL where information about the author can be found
     """
 
-    rationale = db.Column(db.Text)
+    rationale = db.deferred(db.Column(db.Text))
     """
     Why should this author be included in the benchmark
     """
@@ -0,0 +1,125 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The package is meant to be used as a submodule under any name, so it is
+# loaded from its location rather than by name.
+spec = importlib.util.spec_from_file_location(
+    'models', os.path.join(ROOT, '__init__.py'),
+    submodule_search_locations=[ROOT])
+models = importlib.util.module_from_spec(spec)
+sys.modules['models'] = models
+spec.loader.exec_module(models)
+
+db = models.db
+Organization = models.Organization
+
+
+@pytest.fixture
+def tree():
+    """
+    Creates NYU :: Stern :: IOMS :: Information Systems and NYU :: CS in an
+    in-memory database, and returns the organizations by name.
+    """
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    models.init_app(app)
+    with app.app_context():
+        db.create_all()
+        nyu = Organization(name='NYU')
+        stern = Organization(name='Stern', parent=nyu)
+        ioms = Organization(name='IOMS', parent=stern)
+        infosys = Organization(name='Information Systems', parent=ioms)
+        cs = Organization(name='CS', parent=nyu)
+        db.session.add_all([nyu, stern, ioms, infosys, cs])
+        db.session.commit()
+        yield {o.name: o for o in (nyu, stern, ioms, infosys, cs)}
+        db.session.remove()
+        db.drop_all()
+
+
+def stored_paths(tree):
+    """
+    Gets the paths stored in the database, keyed by the original names.
+    """
+    db.session.expire_all()
+    return {name: o.materialized_path for name, o in tree.items()}
+
+
+def test_insert(tree):
+    assert stored_paths(tree) == {
+        'NYU': 'NYU',
+        'Stern': 'NYU :: Stern',
+        'IOMS': 'NYU :: Stern :: IOMS',
+        'Information Systems': 'NYU :: Stern :: IOMS :: Information Systems',
+        'CS': 'NYU :: CS',
+    }
+
+
+def test_rename(tree):
+    tree['Stern'].name = 'Stern School'
+    db.session.commit()
+    paths = stored_paths(tree)
+    assert paths['Stern'] == 'NYU :: Stern School'
+    assert paths['IOMS'] == 'NYU :: Stern School :: IOMS'
+    assert (paths['Information Systems'] ==
+            'NYU :: Stern School :: IOMS :: Information Systems')
+    assert paths['CS'] == 'NYU :: CS'
+
+
+def test_move(tree):
+    tree['IOMS'].parent = tree['CS']
+    db.session.commit()
+    paths = stored_paths(tree)
+    assert paths['IOMS'] == 'NYU :: CS :: IOMS'
+    assert (paths['Information Systems'] ==
+            'NYU :: CS :: IOMS :: Information Systems')
+    assert paths['Stern'] == 'NYU :: Stern'
+
+
+def test_rename_and_move_in_same_flush(tree):
+    tree['CS'].name = 'Computer Science'
+    tree['IOMS'].parent = tree['CS']
+    tree['NYU'].name = 'New York University'
+    db.session.commit()
+    assert stored_paths(tree) == {
+        'NYU': 'New York University',
+        'Stern': 'New York University :: Stern',
+        'IOMS': 'New York University :: Computer Science :: IOMS',
+        'Information Systems': 'New York University :: Computer Science :: '
+                               'IOMS :: Information Systems',
+        'CS': 'New York University :: Computer Science',
+    }
+
+
+def test_descendants_in_session_are_refreshed(tree):
+    tree['NYU'].name = 'New York University'
+    db.session.flush()
+    assert (tree['Information Systems'].materialized_path ==
+            'New York University :: Stern :: IOMS :: Information Systems')
+
+
+def test_rebuild_materialized_paths(tree):
+    expected = stored_paths(tree)
+    db.session.execute(db.text('UPDATE organization '
+                               'SET materialized_path = NULL'))
+    db.session.commit()
+    assert set(stored_paths(tree).values()) == {None}
+    Organization.rebuild_materialized_paths(db.session)
+    db.session.commit()
+    assert stored_paths(tree) == expected
+
+
+def test_trees_ignore_unflushed_renames(tree):
+    with db.session.no_autoflush:
+        tree['NYU'].name = 'New York University'
+        tree['IOMS'].name = 'Operations'
+        assert (tree['Information Systems'].ancestor_tree() ==
+                'New York University :: Stern :: Operations')
+        assert tree['IOMS'].ancestor_tree() == 'New York University :: Stern'